@@ -1,24 +1,157 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 import time
-import pandas as pd
+from array import array
+from bisect import bisect_right
 from datetime import datetime, timedelta
 import os
+import re
+import shutil
+import signal
+import struct
+import sys
+import threading
+
+# One history record on disk: epoch seconds and account value, little-endian float64
+HISTORY_RECORD = struct.Struct("<dd")
+# How much equity history to keep in memory, in seconds
+HISTORY_WINDOW = 7 * 24 * 3600
+# ANSI color codes, stripped when measuring visible line width
+ANSI_ESCAPE = re.compile(r'\033\[[0-9;]*m')
 
 class HyperliquidMonitor:
+    # Color-coded direction labels and P&L colors (indexed by pnl >= 0)
+    _DIRECTION_TEXT = {
+        "LONG": "\033[92m▲ LONG\033[0m",
+        "SHORT": "\033[91m▼ SHORT\033[0m"
+    }
+    _PNL_COLOR = ("\033[91m", "\033[92m")
+    _ROW_TEMPLATE = ("{symbol:<12} {direction:<20} {size:<15.4f} "
+                     "${entry_price:<14.2f} {pnl_color}${unrealized_pnl:+,.2f}\033[0m")
+    
     def __init__(self, account_address):
         self.account_address = account_address
         self.base_url = "https://api.hyperliquid.xyz/info"
-        self.equity_history = []
+        # The request body never changes, so serialize it once
+        self._payload = orjson.dumps({
+            "type": "clearinghouseState",
+            "user": account_address
+        })
+        # Equity history as parallel arrays: float64 epoch seconds and float32
+        # account values (display precision; the on-disk log keeps full float64)
+        self.equity_timestamps = array('d')
+        self.equity_values = array('f')
+        
+        # Append-only on-disk log so history survives restarts. The address is
+        # user input, so keep only [0-9a-z] in the file name; the log itself is
+        # opened on the first write
+        safe_address = re.sub(r'[^0-9a-z]', '_', account_address.lower())
+        self.history_path = f"equity_{safe_address}.bin"
+        self._history_log = None
+        self._load_history()
+        
+        # Reuse one keep-alive connection across polls instead of a new TLS handshake each time
+        self.session = requests.Session()
+        # POST is not retried by default; the info endpoint is read-only, so it is safe here
+        retries = Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504],
+                        allowed_methods=frozenset({"POST"}))
+        self.session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=retries))
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "Connection": "keep-alive"
+        })
+        
+        # Last rendered screen state and its size, used to skip redundant redraws
+        self._last_screen_state = None
+        self._screen_lines = 0
+        self._screen_width = 0
+        
+        # Set by stop() (e.g. from another thread) to end the monitoring loop
+        self._stop = threading.Event()
+    
+    def close(self):
+        """Release pooled HTTP connections and the history log"""
+        self.session.close()
+        self._close_history_log()
+    
+    def __del__(self):
+        session = getattr(self, 'session', None)
+        if session is not None:
+            session.close()
+        if getattr(self, '_history_log', None) is not None:
+            self._close_history_log()
+    
+    def _close_history_log(self):
+        """Close the history log; it is reopened on the next write"""
+        history_log, self._history_log = self._history_log, None
+        if history_log is not None:
+            try:
+                history_log.close()
+            except OSError:
+                pass
+    
+    def _load_history(self):
+        """Load the last 7 days of equity history, compacting the on-disk log to that window"""
+        if not os.path.exists(self.history_path):
+            return
+        try:
+            with open(self.history_path, "rb") as f:
+                raw = f.read()
+        except OSError as e:
+            print(f"History Log Error: {e}")
+            return
+        
+        # Ignore a partially written trailing record
+        records = array('d')
+        records.frombytes(raw[:len(raw) - len(raw) % HISTORY_RECORD.size])
+        if sys.byteorder == 'big':
+            records.byteswap()
+        
+        timestamps = records[0::2]
+        start = bisect_right(timestamps, time.time() - HISTORY_WINDOW)
+        self.equity_timestamps = timestamps[start:]
+        self.equity_values = array('f', records[2 * start + 1::2])
+        
+        # Rewrite the log with only the kept records so it doesn't grow forever
+        kept = raw[start * HISTORY_RECORD.size:len(raw) - len(raw) % HISTORY_RECORD.size]
+        if len(kept) != len(raw):
+            tmp_path = self.history_path + ".tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(kept)
+                os.replace(tmp_path, self.history_path)
+            except OSError as e:
+                print(f"History Log Error: {e}")
+    
+    def _append_history(self, now, total_value):
+        """Append one sample to the on-disk log; I/O errors are reported, not raised"""
+        try:
+            if self._history_log is None:
+                self._history_log = open(self.history_path, "ab")
+            self._history_log.write(HISTORY_RECORD.pack(now, total_value))
+            self._history_log.flush()
+        except OSError as e:
+            print(f"History Log Error: {e}")
+            # The message shifted the screen; force a full redraw next time
+            self._last_screen_state = None
+            self._close_history_log()
+    
+    def _prune_history(self, now):
+        """Drop in-memory samples older than 7 days"""
+        seven_days_ago = now - HISTORY_WINDOW
+        # Timestamps are appended in order, so binary search for the cutoff
+        stale = bisect_right(self.equity_timestamps, seven_days_ago)
+        if stale:
+            del self.equity_timestamps[:stale]
+            del self.equity_values[:stale]
         
     def get_account_info(self):
         """Fetch account information"""
         try:
-            payload = {
-                "type": "clearinghouseState",
-                "user": self.account_address
-            }
-            response = requests.post(self.base_url, json=payload, timeout=10)
-            data = response.json()
+            response = self.session.post(self.base_url, data=self._payload, timeout=10)
+            data = orjson.loads(response.content)
             
             if 'error' in data:
                 print(f"Error: {data['error']}")
@@ -28,36 +161,31 @@ class HyperliquidMonitor:
             print(f"API Request Error: {e}")
             return None
     
-    def get_positions(self):
-        """Get current positions"""
-        data = self.get_account_info()
+    def get_positions(self, data):
+        """Get current positions from an account info snapshot"""
         if not data:
             return []
         
         positions = []
-        if 'assetPositions' in data:
-            for pos in data['assetPositions']:
-                position_info = pos['position']
-                symbol = position_info['coin']
-                size = float(position_info['szi'])
-                entry_px = float(position_info['entryPx'])
-                unrealized_pnl = float(position_info.get('unrealizedPnl', 0))
-                
-                if size != 0:
-                    direction = "LONG" if size > 0 else "SHORT"
-                    positions.append({
-                        'symbol': symbol,
-                        'size': abs(size),
-                        'direction': direction,
-                        'entry_price': entry_px,
-                        'unrealized_pnl': unrealized_pnl
-                    })
+        for pos in data.get('assetPositions', ()):
+            position_info = pos['position']
+            size = float(position_info['szi'])
+            # Skip flat positions before parsing their remaining fields
+            if size == 0:
+                continue
+            
+            positions.append({
+                'symbol': position_info['coin'],
+                'size': abs(size),
+                'direction': "LONG" if size > 0 else "SHORT",
+                'entry_price': float(position_info['entryPx']),
+                'unrealized_pnl': float(position_info.get('unrealizedPnl', 0))
+            })
         
         return positions
     
-    def get_account_value(self):
-        """Get total account value"""
-        data = self.get_account_info()
+    def get_account_value(self, data, now=None):
+        """Get total account value from an account info snapshot (now in epoch seconds)"""
         if not data:
             return 0
         
@@ -66,74 +194,138 @@ class HyperliquidMonitor:
             total_value = float(data['marginSummary'].get('accountValue', 0))
         
         # Record historical data
-        self.equity_history.append({
-            'timestamp': datetime.now(),
-            'value': total_value
-        })
+        if now is None:
+            now = time.time()
+        self.equity_timestamps.append(now)
+        self.equity_values.append(total_value)
+        self._append_history(now, total_value)
         
-        # Keep only last 7 days of data
-        seven_days_ago = datetime.now() - timedelta(days=7)
-        self.equity_history = [h for h in self.equity_history 
-                              if h['timestamp'] > seven_days_ago]
+        # Keep only last 7 days of data in memory
+        self._prune_history(now)
         
         return total_value
     
-    def display_positions(self, positions):
+    def display_positions(self, positions, total_value, now, next_update):
         """Display position information"""
-        os.system('cls' if os.name == 'nt' else 'clear')
-        print("=" * 70)
-        print(f"HYPERLIQUID ACCOUNT MONITOR")
-        print(f"Account: {self.account_address[:10]}...{self.account_address[-6:]}")
-        print(f"Last Update: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print("=" * 70)
+        last_update = now.strftime('%Y-%m-%d %H:%M:%S')
+        screen_state = (total_value, tuple(
+            (p['symbol'], p['size'], p['direction'], p['entry_price'], p['unrealized_pnl'])
+            for p in positions
+        ))
+        
+        # Only patch in place if the last full redraw fit on screen without
+        # scrolling or wrapping, so row offsets from the cursor are exact
+        terminal = shutil.get_terminal_size()
+        fits_on_screen = (self._screen_lines < terminal.lines
+                          and self._screen_width < terminal.columns)
+        if screen_state == self._last_screen_state and fits_on_screen:
+            # Nothing changed: rewrite the "Last Update" line (4th line of the
+            # screen) and the "Next update" footer, moving relative to the cursor
+            up = self._screen_lines - 3
+            sys.stdout.write(
+                f"\0337\033[{up}F\033[2KLast Update: {last_update}\0338"
+                f"\033[2F\033[2KNext update: {next_update.strftime('%H:%M:%S')}\033[2E"
+            )
+            sys.stdout.flush()
+            return
+        self._last_screen_state = screen_state
         
-        total_value = self.get_account_value()
-        print(f"Account Value: ${total_value:,.2f}")
-        print("-" * 70)
+        # Build the whole screen and emit it with a single write; clear and home
+        # the cursor with ANSI codes instead of spawning `clear`
+        lines = [
+            "\033[2J\033[H" + "=" * 70,
+            "HYPERLIQUID ACCOUNT MONITOR",
+            f"Account: {self.account_address[:10]}...{self.account_address[-6:]}",
+            f"Last Update: {last_update}",
+            "=" * 70,
+            f"Account Value: ${total_value:,.2f}",
+            "-" * 70
+        ]
         
         if not positions:
-            print("No active positions")
-            return
+            lines.append("No active positions")
+        else:
+            lines.extend(self._format_position_rows(positions))
         
-        print(f"{'Symbol':<12} {'Direction':<12} {'Size':<15} {'Entry Price':<15} {'Unrealized P&L':<15}")
-        print("-" * 70)
+        # Show next update time
+        lines.append(f"\nNext update: {next_update.strftime('%H:%M:%S')}")
+        lines.append("Press Ctrl+C to stop monitoring")
         
+        screen = "\n".join(lines) + "\n"
+        self._screen_lines = screen.count("\n")
+        self._screen_width = max(len(ANSI_ESCAPE.sub("", line)) for line in screen.split("\n"))
+        sys.stdout.write(screen)
+        sys.stdout.flush()
+    
+    def _format_position_rows(self, positions):
+        """Format the position table as a list of lines"""
+        rows = [
+            f"{'Symbol':<12} {'Direction':<12} {'Size':<15} {'Entry Price':<15} {'Unrealized P&L':<15}",
+            "-" * 70
+        ]
         for pos in positions:
-            direction = pos['direction']
-            
-            # Color-coded direction
-            if direction == "LONG":
-                direction_text = f"\033[92m▲ LONG\033[0m"
-            else:
-                direction_text = f"\033[91m▼ SHORT\033[0m"
-            
-            # Format P&L with color
-            pnl = pos['unrealized_pnl']
-            pnl_color = "\033[92m" if pnl >= 0 else "\033[91m"
-            pnl_text = f"{pnl_color}${pnl:+,.2f}\033[0m"
-            
-            print(f"{pos['symbol']:<12} {direction_text:<20} {pos['size']:<15.4f} "
-                  f"${pos['entry_price']:<14.2f} {pnl_text:<20}")
+            rows.append(self._ROW_TEMPLATE.format_map({
+                **pos,
+                'direction': self._DIRECTION_TEXT[pos['direction']],
+                'pnl_color': self._PNL_COLOR[pos['unrealized_pnl'] >= 0]
+            }))
+        return rows
+    
+    def stop(self):
+        """Ask the monitoring loop to exit"""
+        self._stop.set()
+    
+    def _handle_stop_signal(self, signum, frame):
+        # Raise rather than set the Event: its lock isn't reentrant, and raising also
+        # interrupts a blocked HTTP request that PEP 475 would otherwise resume
+        raise KeyboardInterrupt
     
     def monitor(self, update_interval=10):
         """Main monitoring loop"""
         print(f"\nStarting account monitoring... (Update interval: {update_interval}s)")
         print("Press Ctrl+C to stop\n")
         
+        if os.name == 'nt':
+            # Running any command via os.system switches the classic Windows console
+            # into ANSI (virtual terminal) mode, which the screen rendering relies on
+            os.system('')
+        
+        self._stop.clear()
+        # Ctrl+C / SIGTERM interrupt the wait or the tick in progress
+        previous_handlers = {}
+        if threading.current_thread() is threading.main_thread():
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                previous_handlers[sig] = signal.signal(sig, self._handle_stop_signal)
+        
         try:
-            while True:
-                positions = self.get_positions()
-                self.display_positions(positions)
+            while not self._stop.is_set():
+                # Schedule against a fixed deadline so work time doesn't add drift
+                deadline = time.monotonic() + update_interval
+                # Take the clock once per tick and share it with history and display
+                now = time.time()
                 
-                # Show next update time
-                next_update = datetime.now() + timedelta(seconds=update_interval)
-                print(f"\nNext update: {next_update.strftime('%H:%M:%S')}")
-                print("Press Ctrl+C to stop monitoring")
+                # One API call per tick; positions and account value share the snapshot
+                data = self.get_account_info()
+                if data is None:
+                    # An error message was printed; the cached screen layout is stale
+                    self._last_screen_state = None
+                positions = self.get_positions(data)
+                total_value = self.get_account_value(data, now)
                 
-                time.sleep(update_interval)
+                now_dt = datetime.fromtimestamp(now)
+                next_update = now_dt + timedelta(seconds=update_interval)
+                self.display_positions(positions, total_value, now_dt, next_update)
                 
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    self._stop.wait(remaining)
         except KeyboardInterrupt:
-            print("\n\n🛑 Monitoring stopped")
+            pass
+        finally:
+            for sig, handler in previous_handlers.items():
+                signal.signal(sig, handler)
+        
+        print("\n\n🛑 Monitoring stopped")
 
 def main():
     """Main program"""
@@ -156,19 +348,21 @@ def main():
     
     # Create monitor instance
     monitor = HyperliquidMonitor(account_address)
-    
-    # Test connection
-    print("\nTesting connection...")
-    test_data = monitor.get_account_info()
-    if not test_data:
-        print("Error: Cannot connect to Hyperliquid API or invalid account address")
-        return
-    
-    print("✅ Connection successful! Starting monitoring...")
-    time.sleep(2)
-    
-    # Start monitoring
-    monitor.monitor(update_interval=10)
+    try:
+        # Test connection
+        print("\nTesting connection...")
+        test_data = monitor.get_account_info()
+        if not test_data:
+            print("Error: Cannot connect to Hyperliquid API or invalid account address")
+            return
+        
+        print("✅ Connection successful! Starting monitoring...")
+        time.sleep(2)
+        
+        # Start monitoring
+        monitor.monitor(update_interval=10)
+    finally:
+        monitor.close()
 
 if __name__ == "__main__":
     main()